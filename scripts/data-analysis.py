@@ -1,87 +1,211 @@
 import numpy as np
 import json
 import os
-from typing import List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, List, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _load_json(path: str) -> Any:
+    """Load a JSON file, using orjson when it is installed"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def _dump_json(obj: Any, path: str, indent: bool = False) -> None:
+    """Write obj to a JSON file, using orjson when it is installed"""
+    if orjson is not None:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    else:
+        data = json.dumps(obj, indent=2 if indent else None).encode()
+    with open(path, 'wb') as f:
+        f.write(data)
+
+def _read_first_line(f, size: int) -> bytes:
+    """Read the first line of a binary file, reading only size bytes when the line fits"""
+    data = f.read(size)
+    if len(data) == size and b'\n' not in data:
+        data += f.readline()
+    return data.split(b'\n', 1)[0]
+
+@lru_cache(maxsize=None)
+def _read_config(result_path: str) -> Optional[Tuple[bool, float, np.ndarray]]:
+    """Read (success, action_time, tokens) for one result directory, or None if it has no status"""
+    # Read success/failure status; only the first line of a short file matters
+    try:
+        with open(os.path.join(result_path, 'success_failure.txt'), 'rb') as f:
+            success = _read_first_line(f, 16).strip() == b'success'
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    
+    action_time = 0.0
+    tokens = np.empty(0)
+    
+    if success:
+        # Read action times
+        try:
+            with open(os.path.join(result_path, 'env_action_times.txt'), 'rb') as f:
+                action_time = float(_read_first_line(f, 32))
+        except (FileNotFoundError, NotADirectoryError):
+            pass
+        
+        # Read token usage, preferring the packed float32 log over the text one
+        try:
+            tokens = np.fromfile(os.path.join(result_path, 'token_num_count.f32'), dtype=np.float32)
+        except (FileNotFoundError, NotADirectoryError):
+            try:
+                with open(os.path.join(result_path, 'token_num_count.txt'), 'r') as f:
+                    tokens = np.fromstring(f.read(), sep='\n')
+            except (FileNotFoundError, NotADirectoryError):
+                pass
+    
+    return success, action_time, tokens
+
+def _result_file_mtimes(result_path: str) -> List[Optional[int]]:
+    """Modification times of the files _read_config reads, with None for missing files"""
+    mtimes = []
+    for file_name in ('success_failure.txt', 'env_action_times.txt',
+                      'token_num_count.f32', 'token_num_count.txt'):
+        try:
+            mtimes.append(os.stat(os.path.join(result_path, file_name)).st_mtime_ns)
+        except (FileNotFoundError, NotADirectoryError):
+            mtimes.append(None)
+    return mtimes
 
 class ExperimentAnalyzer:
     def __init__(self, data_dir: str):
         self.data_dir = data_dir
-        self.candidate_list = [
-            ('CMAS', '_wo_any_dialogue_history'), 
-            ('CMAS', '_w_only_state_action_history'),
-            ('HMAS-2', '_wo_any_dialogue_history'), 
-            ('HMAS-2', '_w_only_state_action_history'),
-            ('HMAS-2', '_w_all_dialogue_history'), 
-            ('HMAS-1', '_w_only_state_action_history')
+        # (framework, dialogue_method, config_key, method_display) per candidate
+        self.candidates = [
+            (framework, dialogue_method, f"{framework}{dialogue_method}",
+             dialogue_method.lstrip('_').replace('_', ' ').title())
+            for framework, dialogue_method in [
+                ('CMAS', '_wo_any_dialogue_history'), 
+                ('CMAS', '_w_only_state_action_history'),
+                ('HMAS-2', '_wo_any_dialogue_history'), 
+                ('HMAS-2', '_w_only_state_action_history'),
+                ('HMAS-2', '_w_all_dialogue_history'), 
+                ('HMAS-1', '_w_only_state_action_history')
+            ]
         ]
+        self.config_keys = {config_key for _, _, config_key, _ in self.candidates}
+        self.grid_sizes = [(2, 2), (2, 4), (4, 4), (4, 8)]
+        self.iteration_num = 10
+        
+        # The experiment layout is fixed, so resolve every grid and iteration
+        # directory once here instead of on each analysis pass
+        self.grid_dirs = {
+            (pg_row_num, pg_column_num): os.path.join(data_dir, f'env_pg_state_{pg_row_num}_{pg_column_num}')
+            for pg_row_num, pg_column_num in self.grid_sizes
+        }
+        self.iteration_dirs = {
+            grid_size: tuple(os.path.join(grid_dir, f'pg_state{iteration}') for iteration in range(self.iteration_num))
+            for grid_size, grid_dir in self.grid_dirs.items()
+        }
+        self._results = None
     
     def analyze_results(self) -> Dict:
         """Analyze experiment results across different configurations"""
+        if self._results is not None:
+            return self._results
+        
         results = {}
         
-        for pg_row_num, pg_column_num in [(2, 2), (2, 4), (4, 4), (4, 8)]:
-            grid_key = f"{pg_row_num}x{pg_column_num}"
-            results[grid_key] = self._analyze_grid_size(pg_row_num, pg_column_num)
+        # Result files are small and reads are IO-bound, so overlap them on a
+        # thread pool shared by all grid sizes
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            for pg_row_num, pg_column_num in self.grid_sizes:
+                grid_key = f"{pg_row_num}x{pg_column_num}"
+                results[grid_key] = self._analyze_grid_size(pg_row_num, pg_column_num, executor)
         
+        self._results = results
         return results
     
-    def _analyze_grid_size(self, pg_row_num: int, pg_column_num: int) -> Dict:
+    def _analyze_grid_size(self, pg_row_num: int, pg_column_num: int,
+                           executor: ThreadPoolExecutor) -> Dict:
         """Analyze results for a specific grid size"""
+        grid_dir = self.grid_dirs[(pg_row_num, pg_column_num)]
+        result_dirs = self._list_result_dirs(self.iteration_dirs[(pg_row_num, pg_column_num)])
+        result_paths = [path for paths in result_dirs.values() for path in paths]
+        
+        # The cached analysis is still valid while every result file it was
+        # built from has the same modification time, and no file has appeared
+        # or disappeared since
+        sources = [[path, _result_file_mtimes(path)] for path in result_paths]
+        cache_file = os.path.join(grid_dir, '.analysis_cache.json')
+        try:
+            cache = _load_json(cache_file)
+            if cache['sources'] == sources:
+                return cache['results']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        
+        # Files may have changed since they were memoized, so re-read them all;
+        # the pass below then hits the freshly filled cache
+        _read_config.cache_clear()
+        list(executor.map(_read_config, result_paths))
+        
         grid_results = {}
         
-        for framework, dialogue_method in self.candidate_list:
-            config_key = f"{framework}{dialogue_method}"
+        for _, _, config_key, _ in self.candidates:
             grid_results[config_key] = self._analyze_configuration(
-                pg_row_num, pg_column_num, framework, dialogue_method
+                result_dirs.get(config_key, [])
             )
         
+        try:
+            _dump_json({
+                'sources': sources,
+                'results': grid_results
+            }, cache_file)
+        except OSError:
+            pass
+        
         return grid_results
     
-    def _analyze_configuration(self, pg_row_num: int, pg_column_num: int, 
-                             framework: str, dialogue_method: str) -> Dict:
+    def _list_result_dirs(self, iteration_dirs: Tuple[str, ...]) -> Dict[str, List[str]]:
+        """Map each configuration to its existing result directories, in iteration order"""
+        result_dirs = {}
+        
+        for iteration_dir in iteration_dirs:
+            try:
+                with os.scandir(iteration_dir) as entries:
+                    for entry in entries:
+                        if entry.name in self.config_keys and entry.is_dir():
+                            result_dirs.setdefault(entry.name, []).append(entry.path)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+        
+        return result_dirs
+    
+    def _analyze_configuration(self, result_dirs: List[str]) -> Dict:
         """Analyze results for a specific configuration"""
-        success_count = 0
-        total_action_time = 0
-        total_token_usage = 0
-        total_api_queries = 0
-        valid_experiments = 0
-        
-        for iteration in range(10):
-            result_path = os.path.join(
-                self.data_dir,
-                f'env_pg_state_{pg_row_num}_{pg_column_num}',
-                f'pg_state{iteration}',
-                f'{framework}{dialogue_method}'
-            )
-            
-            if not os.path.exists(result_path):
+        # Per-iteration values, reduced in one vectorized pass at the end
+        experiment_num = len(result_dirs)
+        valid_mask = np.zeros(experiment_num, dtype=bool)
+        success_mask = np.zeros(experiment_num, dtype=bool)
+        action_arr = np.zeros(experiment_num)
+        token_arr = np.zeros(experiment_num)
+        queries_arr = np.zeros(experiment_num, dtype=np.int64)
+        
+        for index, result_path in enumerate(result_dirs):
+            result = _read_config(result_path)
+            if result is None:
                 continue
             
-            # Read success/failure status
-            success_file = os.path.join(result_path, 'success_failure.txt')
-            if os.path.exists(success_file):
-                with open(success_file, 'r') as f:
-                    status = f.readline().strip()
-                
-                if status == 'success':
-                    success_count += 1
-                    
-                    # Read action times
-                    action_time_file = os.path.join(result_path, 'env_action_times.txt')
-                    if os.path.exists(action_time_file):
-                        with open(action_time_file, 'r') as f:
-                            action_time = float(f.readline().strip())
-                            total_action_time += action_time
-                    
-                    # Read token usage
-                    token_file = os.path.join(result_path, 'token_num_count.txt')
-                    if os.path.exists(token_file):
-                        with open(token_file, 'r') as f:
-                            tokens = [float(line.strip()) for line in f.readlines()]
-                            total_token_usage += sum(tokens)
-                            total_api_queries += len(tokens)
-                
-                valid_experiments += 1
+            valid_mask[index] = True
+            success_mask[index], action_arr[index], tokens = result
+            token_arr[index] = tokens.sum(dtype=np.float64)
+            queries_arr[index] = tokens.size
+        
+        valid_experiments = int(valid_mask.sum())
+        success_count = int(success_mask.sum())
+        total_action_time = float(action_arr[success_mask].sum())
+        total_token_usage = float(token_arr[success_mask].sum())
+        total_api_queries = int(queries_arr[success_mask].sum())
         
         return {
             'success_rate': success_count / max(valid_experiments, 1),
@@ -95,28 +219,28 @@ class ExperimentAnalyzer:
         """Generate a comprehensive comparison report"""
         results = self.analyze_results()
         
-        report = "# Multi-Agent Framework Analysis Report\n\n"
+        parts = ["# Multi-Agent Framework Analysis Report\n\n"]
         
         for grid_size, grid_results in results.items():
-            report += f"## Grid Size: {grid_size}\n\n"
+            parts.append(f"## Grid Size: {grid_size}\n\n")
             
             # Create comparison table
-            report += "| Framework | Dialogue Method | Success Rate | Avg Action Time | Avg Token Usage | Avg API Queries |\n"
-            report += "|-----------|----------------|--------------|-----------------|-----------------|------------------|\n"
+            parts.append("| Framework | Dialogue Method | Success Rate | Avg Action Time | Avg Token Usage | Avg API Queries |\n")
+            parts.append("|-----------|----------------|--------------|-----------------|-----------------|------------------|\n")
             
-            for config, metrics in grid_results.items():
-                framework, method = config.split('_', 1)
-                method_display = method.replace('_', ' ').title()
-                
-                report += f"| {framework} | {method_display} | "
-                report += f"{metrics['success_rate']:.2%} | "
-                report += f"{metrics['avg_action_time']:.1f} | "
-                report += f"{metrics['avg_token_usage']:.0f} | "
-                report += f"{metrics['avg_api_queries']:.1f} |\n"
+            for framework, _, config_key, method_display in self.candidates:
+                metrics = grid_results[config_key]
+                parts.append(
+                    f"| {framework} | {method_display} | "
+                    f"{metrics['success_rate']:.2%} | "
+                    f"{metrics['avg_action_time']:.1f} | "
+                    f"{metrics['avg_token_usage']:.0f} | "
+                    f"{metrics['avg_api_queries']:.1f} |\n"
+                )
             
-            report += "\n"
+            parts.append("\n")
         
-        return report
+        return ''.join(parts)
 
 if __name__ == "__main__":
     # Example usage
@@ -127,5 +251,4 @@ if __name__ == "__main__":
     print(report)
     
     # Save results to JSON
-    with open('experiment_analysis.json', 'w') as f:
-        json.dump(results, f, indent=2)
+    _dump_json(results, 'experiment_analysis.json', indent=True)
@@ -1,100 +1,138 @@
 import json
 import os
-import random
+import numpy as np
 import shutil
-from typing import List, Dict, Tuple
+from functools import lru_cache
+from typing import Any, List, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize obj to compact JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+@lru_cache(maxsize=None)
+def _key_template(pg_row_num: int, pg_column_num: int) -> Tuple[str, ...]:
+    """Position keys for a grid: agent squares (center coordinates), then corners"""
+    center_keys = [f"{i+0.5}_{j+0.5}" for i in range(pg_row_num) for j in range(pg_column_num)]
+    corner_keys = [f"{float(i)}_{float(j)}" for i in range(pg_row_num + 1) for j in range(pg_column_num + 1)]
+    return tuple(center_keys + corner_keys)
 
 class ArtifactEnvironmentCreator:
     """Creates environments for multi-agent artifact manipulation experiments"""
     
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, seed: Optional[int] = None):
         self.base_path = base_path
         self.colors = ['blue', 'red', 'green', 'purple', 'orange']
+        # Items are stored as integer codes: artifact_{color} is the color's
+        # index, target_{color} is offset by the number of colors
+        self.item_names = [f'artifact_{color}' for color in self.colors] + \
+                          [f'target_{color}' for color in self.colors]
+        self.rng = np.random.default_rng(seed)
     
     def create_environment(self, pg_row_num: int, pg_column_num: int, 
-                         artifact_num_low: int = 1, artifact_num_high: int = 1) -> Dict:
-        """Create a single environment configuration"""
+                         artifact_num_low: int = 1, artifact_num_high: int = 1) -> Tuple[Dict, int, int]:
+        """Create a single environment configuration and its artifact and target counts"""
         
-        # Initialize grid dictionary
-        pg_dict = {}
+        # Track occupancy in arrays indexed by grid position; the string-keyed
+        # dictionary is only built once placement is finished
+        corners = np.zeros((pg_row_num + 1, pg_column_num + 1), dtype=np.int8)
+        corner_items = [[] for _ in range((pg_row_num + 1) * (pg_column_num + 1))]
+        center_items = [[] for _ in range(pg_row_num * pg_column_num)]
         
-        # Initialize agent squares (center coordinates)
-        for i in range(pg_row_num):
-            for j in range(pg_column_num):
-                pg_dict[f"{i+0.5}_{j+0.5}"] = []
+        # Sample every random draw for this environment up front
+        artifact_nums = self.rng.integers(artifact_num_low, artifact_num_high + 1, size=len(self.colors))
+        total_artifacts = int(artifact_nums.sum())
         
-        # Initialize corner positions
-        for i in range(pg_row_num + 1):
-            for j in range(pg_column_num + 1):
-                pg_dict[f"{float(i)}_{float(j)}"] = []
+        # Random position for artifact (corner) and target (agent square)
+        artifact_squares = self.rng.integers(0, pg_row_num * pg_column_num, size=total_artifacts)
+        a_artifacts, b_artifacts = np.divmod(artifact_squares, pg_column_num)
+        target_squares = self.rng.integers(0, pg_row_num * pg_column_num, size=total_artifacts)
+        
+        # Shuffled corner offsets to try for each artifact
+        corner_offsets = np.array([(1, 0), (0, 0), (0, 1), (1, 1)])
+        corner_orders = self.rng.permuted(np.tile(np.arange(4), (total_artifacts, 1)), axis=1)
+        corner_options = corner_offsets[corner_orders]
         
         # Place artifacts and targets
-        for color in self.colors:
-            artifact_num = random.randint(artifact_num_low, artifact_num_high)
-            
+        artifact_index = 0
+        artifact_count = 0
+        target_count = 0
+        for color_index, artifact_num in enumerate(artifact_nums):
             for _ in range(artifact_num):
-                # Random position for artifact (corner)
-                artifact_square = random.randint(0, pg_row_num * pg_column_num - 1)
-                a_artifact = artifact_square // pg_column_num
-                b_artifact = artifact_square % pg_column_num
-                
-                # Random position for target (agent square)
-                target_square = random.randint(0, pg_row_num * pg_column_num - 1)
-                a_target = target_square // pg_column_num
-                b_target = target_square % pg_column_num
+                a_artifact = a_artifacts[artifact_index]
+                b_artifact = b_artifacts[artifact_index]
+                target_square = target_squares[artifact_index]
                 
                 # Try to place artifact in available corner
-                corner_options = [(1.0, 0.0), (0.0, 0.0), (0.0, 1.0), (1.0, 1.0)]
-                random.shuffle(corner_options)
-                
-                for random_x, random_y in corner_options:
-                    corner_key = f"{float(a_artifact) + random_x}_{float(b_artifact) + random_y}"
-                    if len(pg_dict[corner_key]) == 0:
-                        pg_dict[corner_key].append(f'artifact_{color}')
-                        pg_dict[f"{a_target+0.5}_{b_target+0.5}"].append(f'target_{color}')
+                for random_x, random_y in corner_options[artifact_index]:
+                    corner_x = a_artifact + random_x
+                    corner_y = b_artifact + random_y
+                    if corners[corner_x, corner_y] == 0:
+                        corners[corner_x, corner_y] = 1
+                        corner_items[corner_x * (pg_column_num + 1) + corner_y].append(color_index)
+                        center_items[target_square].append(len(self.colors) + color_index)
+                        artifact_count += 1
+                        target_count += 1
                         break
+                
+                artifact_index += 1
+        
+        # Build grid dictionary, in the same position order as the key template
+        pg_dict = dict(zip(_key_template(pg_row_num, pg_column_num), center_items + corner_items))
         
-        return pg_dict
+        return pg_dict, artifact_count, target_count
     
     def create_experiment_suite(self, repeat_num: int = 10):
         """Create a complete suite of experiments"""
         
-        if os.path.exists(self.base_path):
+        # Clear out any previous suite; a missing or empty base directory is
+        # handled without walking the tree, and makedirs below recreates it
+        try:
+            os.rmdir(self.base_path)
+        except FileNotFoundError:
+            pass
+        except OSError:
             shutil.rmtree(self.base_path)
-        os.makedirs(self.base_path, exist_ok=True)
+        
+        if repeat_num <= 0:
+            return
         
         grid_sizes = [(2, 2), (2, 4), (4, 4), (4, 8)]
         
         for rows, cols in grid_sizes:
             grid_dir = os.path.join(self.base_path, f'env_pg_state_{rows}_{cols}')
-            os.makedirs(grid_dir, exist_ok=True)
             
+            # makedirs creates the grid directory along with the first
+            # iteration directory, so it needs no separate call
             for iteration in range(repeat_num):
-                iteration_dir = os.path.join(grid_dir, f'pg_state{iteration}')
-                os.makedirs(iteration_dir, exist_ok=True)
-                
-                # Create environment
-                environment = self.create_environment(rows, cols)
-                
-                # Save environment configuration
-                config_file = os.path.join(iteration_dir, f'pg_state{iteration}.json')
-                with open(config_file, 'w') as f:
-                    json.dump(environment, f, indent=2)
-                
-                print(f"Created environment: {rows}x{cols}, iteration {iteration}")
+                os.makedirs(os.path.join(grid_dir, f'pg_state{iteration}'), exist_ok=True)
+            
+            # Save all environment configurations for this grid size, one JSON
+            # document per line, indexed by iteration
+            environments_file = os.path.join(grid_dir, 'environments.jsonl')
+            with open(environments_file, 'wb', buffering=65536) as f:
+                for iteration in range(repeat_num):
+                    # Create environment
+                    environment, _, _ = self.create_environment(rows, cols)
+                    f.write(_dumps(self.decode_environment(environment)) + b'\n')
+                    
+                    print(f"Created environment: {rows}x{cols}, iteration {iteration}")
     
-    def validate_environment(self, environment: Dict) -> bool:
-        """Validate that an environment is properly configured"""
-        
-        artifact_count = 0
-        target_count = 0
-        
-        for position, items in environment.items():
-            for item in items:
-                if item.startswith('artifact_'):
-                    artifact_count += 1
-                elif item.startswith('target_'):
-                    target_count += 1
+    def decode_environment(self, environment: Dict) -> Dict:
+        """Convert item codes to their artifact_/target_ names for serialization"""
+        return {
+            position: [self.item_names[item] for item in items]
+            for position, items in environment.items()
+        }
+    
+    def validate_environment(self, artifact_count: int, target_count: int) -> bool:
+        """Validate an environment from the counts returned by create_environment"""
         
         # Should have equal numbers of artifacts and targets
         return artifact_count == target_count and artifact_count > 0